@@ -26,5 +26,8 @@ if [ -t 0 ]; then
   RUN_ARGS+=( "-it" )
 fi
 
-# Run the user provided args
-docker run "${RUN_ARGS[@]}" ${DOC_IMG} "$@"
+# The docs image is not built from requirements.docs.txt (myst-parser,
+# Sphinx >= 4), so install it before running the user provided args
+docker run "${RUN_ARGS[@]}" ${DOC_IMG} /bin/bash -c '
+  pip install --user --quiet -r requirements.docs.txt &&
+  PATH="$HOME/.local/bin:$PATH" exec "$@"' docker-docs "$@"
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# Sphinx extension that skips re-copying html_static_path when its content
+# has not changed since the last build into the same output directory.
+#
+# After a successful HTML build, a SHA-256 manifest of the static files is
+# written next to the output directory. On the next build, if the manifest
+# still matches and every file is already in the output _static directory,
+# html_static_path is emptied at builder-inited so Sphinx skips the copy.
+#
+import hashlib
+import json
+import os
+import posixpath
+from pathlib import Path
+
+from sphinx.util.matching import Matcher
+
+# Buffer size used when hashing static files.
+_READ_BUFFER_SIZE = 1 << 17
+
+# Manifests computed at builder-inited, by output directory, for reuse once
+# the build has finished.
+_manifests = {}
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with path.open('rb', buffering=_READ_BUFFER_SIZE) as f:
+        for chunk in iter(lambda: f.read(_READ_BUFFER_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_if_changed(path, content):
+    """Write content to path, leaving the file untouched if it is identical.
+
+    Failing to write is not an error; the caller just loses the cache.
+    """
+    try:
+        if path.read_bytes() == content:
+            return
+    except OSError:
+        pass
+    try:
+        path.write_bytes(content)
+    except OSError:
+        pass
+
+
+def _manifest_path(app):
+    # Keyed per output directory so html, dirhtml, etc. each track their own
+    # copy, but kept outside it so the manifest is not published.
+    outdir = Path(app.outdir)
+    return outdir.parent.joinpath(
+        '.{}.static-manifest.json'.format(outdir.name))
+
+
+def _static_manifest(app):
+    """Map each static file Sphinx will copy to the SHA-256 of its content.
+
+    Files are filtered the way Sphinx's copy_asset() filters them, so the
+    manifest lists exactly what ends up in the output _static directory.
+    """
+    excluded = Matcher(app.config.exclude_patterns + ['**/.*'])
+    manifest = {}
+    for entry in app.config.html_static_path:
+        source = os.path.join(app.confdir, entry)
+        if os.path.isfile(source):
+            manifest[os.path.basename(source)] = _file_digest(Path(source))
+            continue
+        for root, dirs, files in os.walk(source, followlinks=True):
+            reldir = os.path.relpath(root, source)
+            dirs[:] = [d for d in dirs
+                       if not excluded(posixpath.join(reldir, d))]
+            for filename in files:
+                name = posixpath.join(reldir, filename)
+                if not excluded(name):
+                    manifest[posixpath.normpath(name)] = \
+                        _file_digest(Path(root, filename))
+    return manifest
+
+
+def skip_unchanged_static(app):
+    """Don't re-copy static files whose content matches the last build."""
+    if app.builder.format != 'html':
+        return
+    current = _manifests[app.outdir] = _static_manifest(app)
+    # Templated (_t) assets are rendered with the config, not just copied.
+    if any(name.lower().endswith('_t') for name in current):
+        return
+    try:
+        previous = json.loads(_manifest_path(app).read_text())
+    except (OSError, ValueError):
+        return
+    outdir = Path(app.outdir, '_static')
+    if previous == current and \
+            all(outdir.joinpath(name).is_file() for name in current):
+        app.config.html_static_path = []
+
+
+def record_static_manifest(app, exception):
+    current = _manifests.get(app.outdir)
+    if exception is None and current is not None:
+        _write_if_changed(_manifest_path(app), json.dumps(
+            current, sort_keys=True).encode('utf-8'))
+
+
+def setup(app):
+    app.connect('builder-inited', skip_unchanged_static)
+    app.connect('build-finished', record_static_manifest)
+
+    # Only builder-inited and build-finished are used, both of which run in
+    # the main process, and nothing is stored in the build environment.
+    return {
+        'parallel_read_safe': True,
+        'parallel_write_safe': True,
+    }
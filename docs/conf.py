@@ -17,54 +17,62 @@
 # If the directory is relative to the documentation root,
 #  use os.path.abspath to make it absolute, like shown here.
 #
+# The Makefile passes -j auto, which parallelises writing. Reading stays
+# serial: sphinxjp.themes.basicstrap and cloud_sptheme.ext.table_styling do
+# not declare parallel_read_safe, so past 5 documents Sphinx warns about
+# both and reads serially.
+#
 import os
 import sys
+from pathlib import Path
 
 sys.path.insert(0, os.path.abspath('.'))
 sys.path.insert(0, os.path.abspath('../'))
-
-import f5_sphinx_theme
-import recommonmark
-import CommonMark
-from recommonmark.parser import CommonMarkParser
+sys.path.insert(0, os.path.abspath('_ext'))
 
 # -- General configuration ------------------------------------------------
 
 # If your documentation needs a minimal Sphinx version, state it here.
+# The extlinks captions below need 4.0; older versions render "issue %s81".
 #
-# needs_sphinx = '1.4.5'
+needs_sphinx = '4.0'
 
 # Add any Sphinx extension module names here, as strings. They can be
 # extensions coming with Sphinx (named 'sphinx.ext.*') or your custom
 # ones.
 extensions = [
     'sphinx.ext.intersphinx',
-    'sphinx.ext.todo',
-    'sphinx.ext.coverage',
     'sphinx.ext.ifconfig',
-    'sphinx.ext.doctest',
     'sphinxjp.themes.basicstrap',
     'sphinx.ext.extlinks',
-    'cloud_sptheme.ext.table_styling'
+    'cloud_sptheme.ext.table_styling',
+    'myst_parser',
+    'static_manifest'
 ]
 
+# The coverage and doctest builders are only needed for the matching make
+# targets; set SPHINX_FULL to load them.
+if os.environ.get('SPHINX_FULL'):
+    extensions += ['sphinx.ext.coverage', 'sphinx.ext.doctest']
+
 # Add any paths that contain templates here, relative to this directory.
-templates_path = ['_templates']
+# Skipped when empty so template lookups don't search it for nothing.
+templates_path = ['_templates'] \
+    if os.path.isdir('_templates') and os.listdir('_templates') else []
 
 # The suffix(es) of source filenames.
 # You can specify multiple suffix as a list of string:
 #
 # source_suffix = ['.rst', '.md']
-source_suffix = ['.rst', '.md']
-
-source_parsers = {
-    '.md': CommonMarkParser,
+source_suffix = {
+    '.rst': 'restructuredtext',
+    '.md': 'markdown',
 }
 
 
 # The encoding of source files.
 #
-source_encoding = 'utf-8-sig'
+source_encoding = 'utf-8'
 
 # The master toctree document.
 master_doc = 'index'
@@ -78,25 +86,36 @@ author = u'F5 Networks'
 # |version| and |release|, also used in various other places throughout the
 # built documents.
 #
-with open('../next-version.txt') as verfile:
-    v = verfile.readline().strip().split('.')
-    # The short X.Y version.
-    version = u'v{}.{}'.format(v[0], v[1])
-    # The full version, including alpha/beta/rc tags.
-    release = u'v{}.{}.{}-dev'.format(v[0], v[1], v[2])
+_ROOT_DIR = Path(__file__).parent.joinpath('..')
+
+v = _ROOT_DIR.joinpath('next-version.txt').read_text() \
+    .split('\n', 1)[0].strip().split('.')
+# The short X.Y version.
+version = u'v{}.{}'.format(v[0], v[1])
+# The full version, including alpha/beta/rc tags.
+release = u'v{}.{}.{}-dev'.format(v[0], v[1], v[2])
+
+
+def _set_html_theme_path(app, config):
+    import f5_sphinx_theme
+    config.html_theme_path = f5_sphinx_theme.get_html_theme_path()
+
+
+def setup(app):
+    app.connect('config-inited', _set_html_theme_path)
 
-# def setup(app):
-#    app.add_config_value('versionlevel', '', 'env')
 
 # External links
 # Lets you easily reference issues in the GitHub repo, e.g. :issues:`81`
 extlinks = {'issues': ('https://github.com/F5Networks/cf-bigip-ctlr/issues/%s',
-                      'issue '),
+                      'issue %s'),
             'cccl-issue': ('https://github.com/f5devcentral/f5-cccl/issues/%s',
-                      'issue ')}
+                      'issue %s')}
 
 # Substitutions
-rst_epilog = '''
+# Only the header depends on the version, so keep the static link targets
+# in a separate constant that is never run through % formatting.
+_RST_EPILOG_DYNAMIC = '''
 .. |url-version| replace:: %(url_version)s
 .. |release-notes| raw:: html
 
@@ -104,24 +123,29 @@ rst_epilog = '''
 .. |attributions| raw:: html
 
     <a href="http://clouddocs.f5.com/products/connectors/cf-bigip-ctlr/%(url_version)s/_static/ATTRIBUTIONS.html">Attributions</a>
+.. _controller application manifest: %(base_url)s/containers/latest/cloudfoundry/cfctlr-app-install.html
+.. _Deploy the BIG-IP Controller for Cloud Foundry with per-Route Virtual Servers: %(base_url)s/containers/latest/cloudfoundry/cf-per-route-virtuals
+.. _user documentation: %(base_url)s/containers/latest/cloudfoundry/index.html
+'''
+
+_RST_EPILOG_STATIC = '''\
 .. |cfctlr| replace:: :code:`cf-bigip-ctlr`
 .. |cfctlr-long| replace:: F5 BIG-IP Controller for Cloud Foundry
 .. _BIG-IP profiles: https://support.f5.com/kb/en-us/products/big-ip_ltm/manuals/product/ltm-profiles-reference-13-0-0.html
 .. _policies: https://support.f5.com/kb/en-us/products/big-ip_ltm/manuals/product/bigip-local-traffic-policies-getting-started-13-0-0.html
 .. _BIG-IP SSL profiles: https://support.f5.com/kb/en-us/products/big-ip_ltm/manuals/product/ltm-profiles-reference-13-0-0/6.html
-.. _controller application manifest: %(base_url)s/containers/latest/cloudfoundry/cfctlr-app-install.html
 .. _Cloud Foundry: https://cloudfoundry.org/
-.. _Deploy the BIG-IP Controller for Cloud Foundry with per-Route Virtual Servers: %(base_url)s/containers/latest/cloudfoundry/cf-per-route-virtuals
 .. _Deploying with Application Manifests: https://docs.cloudfoundry.org/devguide/deploy-apps/manifest.html
 .. _Gorouter: https://github.com/cloudfoundry/gorouter
 .. _route domain: https://support.f5.com/kb/en-us/products/big-ip_ltm/manuals/product/tmos-routing-administration-12-0-0/9.html
 .. _Cloud Foundry Service Broker: https://docs.cloudfoundry.org/services/managing-service-brokers.html
 .. _TLS Server Name Indication: https://tools.ietf.org/html/rfc6066#section-3
-.. _user documentation: %(base_url)s/containers/latest/cloudfoundry/index.html
-''' % {
+'''
+
+rst_epilog = _RST_EPILOG_DYNAMIC % {
     'url_version': version,
     'base_url': 'http://clouddocs.f5.com'
-}
+} + _RST_EPILOG_STATIC
 
 # The language for content autogenerated by Sphinx. Refer to documentation
 # for a list of supported languages.
@@ -142,6 +166,8 @@ language = 'en'
 # List of patterns, relative to source directory, that match files and
 # directories to ignore when looking for source files.
 # This patterns also effect to html_static_path and html_extra_path
+# Directory names are matched bare so Sphinx prunes them without walking
+# their contents.
 exclude_patterns = [
     '_build',
     'Thumbs.db',
@@ -178,6 +204,7 @@ exclude_patterns = [
 # show_authors = False
 
 # The name of the Pygments (syntax highlighting) style to use.
+# 'sphinx' maps straight to SphinxStyle without a Pygments plugin lookup.
 pygments_style = 'sphinx'
 
 # A list of ignored prefixes for module index sorting.
@@ -196,7 +223,8 @@ todo_include_todos = False
 # a list of builtin themes.
 #
 html_theme = 'f5_sphinx_theme'
-html_theme_path = f5_sphinx_theme.get_html_theme_path()
+# html_theme_path is filled in from setup() so the theme package is only
+# imported once Sphinx is actually building.
 html_theme_options = {
     'next_prev_link': False
 }
@@ -253,9 +281,10 @@ html_static_path = ['_static/']
 # html_use_smartypants = True
 
 # Custom sidebar templates, maps document names to template names.
+# f5_sphinx_theme's layout already includes the search box.
 #
 html_sidebars = {
-   '**': ['localtoc.html', 'searchbox.html']
+   '**': ['localtoc.html']
 }
 
 # Additional templates that should be rendered to pages, maps page names to
@@ -277,7 +306,13 @@ html_use_index = True
 
 # If true, links to the reST sources are added to the pages.
 #
-html_show_sourcelink = True
+html_show_sourcelink = False
+
+# If true, the reST sources are included in the HTML build as _sources/name.
+# Sphinx's search page reads result summaries from these, so with this off
+# search results show page titles without a context snippet.
+#
+html_copy_source = False
 
 # If true, "Created using Sphinx" is shown in the HTML footer. Default is True.
 #